@@ -15,10 +15,19 @@ SCREEN_TITLE = "Arcade Space Shooter"
 SCALING = 1.0
 PL_E_SCALING = 1.0
 FULLSCREEN = False
+LONG_SESSION = False
 
 PLAYER_DIRECTORY = "images/jet_anim/"
 MISSILE_DIRECTORY = "images/missile_anim/"
 EXPLOSION_DIRECTORY = "images/explosion_anim/"
+CLOUD_IMAGE = "images/cloud.png"
+
+# Parallax cloud layers, back to front: (clouds per screen, speed, scale)
+CLOUD_LAYERS = [
+    (4, -10, 0.5),
+    (3, -25, 0.75),
+    (2, -45, 1.0),
+]
 
 class SpaceShooter(arcade.Window):
     """Space Shooter side scroller game
@@ -35,11 +44,13 @@ class SpaceShooter(arcade.Window):
 
         # Set up the empty sprite lists
         self.enemies_list = arcade.SpriteList()
-        self.clouds_list = arcade.SpriteList()
+        self.cloud_layers = []
         self.explosions_list = arcade.SpriteList()
         self.all_sprites = arcade.SpriteList()
         self.player = None
         self.background_music = None
+        self.music_player = None
+        self.long_session = LONG_SESSION
         self.score = 0
         self.paused = False
         self.collided = False
@@ -49,25 +60,12 @@ class SpaceShooter(arcade.Window):
 
     def setup(self):
         """Get the game ready to play
+        Loads the assets once, then resets the game state
         """
 
         # Set the background color
         arcade.set_background_color(arcade.color.SKY_BLUE)
 
-        # Set up the player
-        # self.player = arcade.Sprite("images/plane.png", PL_E_SCALING)
-        player_img = os.path.join(PLAYER_DIRECTORY, "Plane_0.png")
-        self.player = AnimatedSprite(player_img, PLAYER_DIRECTORY, PL_E_SCALING)
-        self.player.center_y = self.height / 2
-        self.player.left = 10
-        self.all_sprites.append(self.player)
-
-        # Spawn a new enemy every 0.25 seconds
-        arcade.schedule(self.add_enemy, 0.2)
-
-        # Spawn a new cloud every second
-        arcade.schedule(self.add_cloud, 4.0)
-
         self.explosion_textures = load_anim_frames(EXPLOSION_DIRECTORY)
         self.explosion_img = os.path.join(EXPLOSION_DIRECTORY, "sprite_0.png")
         self.enemy_img = os.path.join(MISSILE_DIRECTORY, "Missile_0.png")
@@ -85,8 +83,43 @@ class SpaceShooter(arcade.Window):
         self.move_up_sound = arcade.load_sound("sounds/Rising_putter.wav")
         self.move_down_sound = arcade.load_sound("sounds/Falling_putter.wav")
 
+        # Build the scrolling cloud background
+        self.cloud_layers = [
+            ParallaxLayer(CLOUD_IMAGE, count, speed, scale * SCALING,
+                          self.width, self.height)
+            for count, speed, scale in CLOUD_LAYERS
+        ]
+
+        self.reset()
+
+    def reset(self):
+        """Start a new game in place
+        Safe to call repeatedly: old sprites, timers and music are
+        cleared first so nothing accumulates between games
+        """
+
+        # Drop everything left over from the last game
+        arcade.unschedule(self.add_enemy)
+        if self.music_player is not None:
+            arcade.stop_sound(self.music_player)
+            self.music_player = None
+        self.enemies_list.clear()
+        self.explosions_list.clear()
+        self.all_sprites.clear()
+
+        # Set up the player
+        # self.player = arcade.Sprite("images/plane.png", PL_E_SCALING)
+        player_img = os.path.join(PLAYER_DIRECTORY, "Plane_0.png")
+        self.player = AnimatedSprite(player_img, PLAYER_DIRECTORY, PL_E_SCALING)
+        self.player.center_y = self.height / 2
+        self.player.left = 10
+        self.all_sprites.append(self.player)
+
+        # Spawn a new enemy every 0.2 seconds
+        arcade.schedule(self.add_enemy, 0.2)
+
         # Start the background music
-        arcade.play_sound(self.background_music)
+        self.music_player = arcade.play_sound(self.background_music)
 
         # Unpause everything and reset the collision timer
         self.paused = False
@@ -95,9 +128,6 @@ class SpaceShooter(arcade.Window):
         self.collision_length = 1.0
         self.score = 0
 
-        for i in range(5):
-            self.add_cloud(0.0, on_screen=True)
-
     def add_enemy(self, delta_time: float):
         """Adds a new enemy to the screen
 
@@ -122,32 +152,6 @@ class SpaceShooter(arcade.Window):
         self.enemies_list.append(enemy)
         self.all_sprites.append(enemy)
 
-    def add_cloud(self, delta_time: float, on_screen=False):
-        """Adds a new cloud to the screen
-
-        Arguments:
-            delta_time {float} -- How much time has passed since the last call
-        """
-        if self.paused:
-            return
-
-        # First, create the new cloud sprite
-        cloud = FlyingSprite("images/cloud.png", SCALING)
-
-        # Set its position to a random height and off screen right
-        if on_screen is True:
-            cloud.left = random.randint(0, SCREEN_WIDTH)
-        else:
-            cloud.left = random.randint(self.width, self.width + 10)
-        cloud.top = random.randint(10, self.height - 10)
-
-        # Set its speed to a random speed heading left
-        cloud.velocity = (random.randint(-50, -10), 0)
-
-        # Add it to the enemies list
-        self.clouds_list.append(cloud)
-        self.all_sprites.append(cloud)
-
     def on_key_press(self, symbol, modifiers):
         """Handle user keyboard input
         Q: Quit the game
@@ -243,13 +247,17 @@ class SpaceShooter(arcade.Window):
 
         if self.collided:
             if time.time() - self.collision_time > self.collision_length:
-                pass
+                # In a long session, start over instead of ending
+                if self.long_session:
+                    self.reset()
+                    return
                 # arcade.close_window()
         
         self.player.update(delta_time)
         self.enemies_list.update()
         self.explosions_list.update()
-        self.clouds_list.update()
+        for layer in self.cloud_layers:
+            layer.update(delta_time)
 
         # Keep the player on screen
         if self.player.top > self.height:
@@ -266,7 +274,8 @@ class SpaceShooter(arcade.Window):
 
         arcade.start_render()
         # self.all_sprites.draw()
-        self.clouds_list.draw(pixelated=True)
+        for layer in self.cloud_layers:
+            layer.draw()
         self.enemies_list.draw(pixelated=True)
         self.player.draw(pixelated=True)
         self.explosions_list.draw(pixelated=True)
@@ -304,9 +313,62 @@ def load_anim_frames(directory):
             frames.append(arcade.load_texture(path))
     return frames
 
+class ParallaxLayer:
+    """One scrolling layer of background clouds
+    The clouds are placed once into a static SpriteList, with copies
+    every screen width so the layer tiles.
+    Scrolling only changes the layer offset, which is applied through the
+    viewport when drawing, so the sprites themselves never move.
+    """
+
+    def __init__(self, image, count, speed, scale, width, height):
+        """Build the layer
+
+        Arguments:
+            image {str} -- Path of the cloud image
+            count {int} -- How many clouds per screen width
+            speed {float} -- Horizontal speed in pixels per second
+            scale {float} -- Scale of each cloud
+            width {int} -- Width of the screen, and the wrap period
+            height {int} -- Height of the screen
+        """
+        self.speed = speed
+        self.width = width
+        self.offset = 0.0
+        self.sprite_list = arcade.SpriteList(use_spatial_hash=False)
+        half_width = arcade.Sprite(image, scale).width / 2
+
+        for i in range(count):
+            x = random.uniform(0, width)
+            y = random.uniform(10, height - 10)
+
+            # The viewport spans [offset, offset + width] with the offset
+            # in [0, width), so tile copies over [0, 2 * width] plus half
+            # a cloud either side
+            first = math.ceil((-half_width - x) / width)
+            last = math.floor((2 * width + half_width - x) / width)
+            for copy in range(first, last + 1):
+                cloud = arcade.Sprite(image, scale)
+                cloud.center_x = x + copy * width
+                cloud.center_y = y
+                self.sprite_list.append(cloud)
+
+    def update(self, delta_time: float = 1/60):
+        """Scroll the layer, wrapping after one screen width"""
+        self.offset = (self.offset - self.speed * delta_time) % self.width
+
+    def draw(self):
+        """Draw the layer shifted by its current offset"""
+        left, right, bottom, top = arcade.get_viewport()
+        arcade.set_viewport(left + self.offset, right + self.offset,
+                            bottom, top)
+        self.sprite_list.draw(pixelated=True)
+        arcade.set_viewport(left, right, bottom, top)
+
+
 class FlyingSprite(arcade.Sprite):
     """Base class for all flying sprites
-    Flying sprites include enemies and clouds
+    Flying sprites include enemies and the player
     """
 
     def update(self, delta_time: float = 1/60):
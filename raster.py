@@ -0,0 +1,282 @@
+# Software rasterizer for the arcade shooter
+# Composites the game into a NumPy image on the CPU, for pixel
+# observations and golden-frame comparisons.
+#
+# Only the compositing avoids OpenGL. A SpaceShooter is an arcade.Window
+# and its cloud layers are SpriteLists, which both need a GL context,
+# for example Mesa's software EGL with ARCADE_HEADLESS=1. Without any GL,
+# pass render() a plain object holding lists of arcade.Sprite instead:
+# loading sprites and textures needs no window.
+
+# Imports
+import sys
+import time
+
+import arcade
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Constants
+BACKGROUND_COLOR = arcade.color.SKY_BLUE
+# on_draw uses arcade's default font, which depends on the machine, so
+# approximate it with a bundled font to keep frames reproducible
+SCORE_FONT_FILE = ":resources:fonts/ttf/Kenney Mini.ttf"
+SCORE_FONT_SIZE = 40
+# Font sizes are in points, pyglet draws them at 96 dpi
+PIXELS_PER_POINT = 96 / 72
+
+
+class SoftwareRenderer:
+    """Composites the game's sprite lists into an RGB image buffer
+    Sprites are snapped to whole pixels and drawn without rotation,
+    which is all the shooter uses. Textures are resized once per sprite
+    size and cached, so a frame is only array copies.
+    """
+
+    def __init__(self, width, height, downscale=1, font_file=SCORE_FONT_FILE):
+        """Set up an empty frame buffer
+
+        Arguments:
+            width {int} -- Width of the game screen
+            height {int} -- Height of the game screen
+            downscale {int} -- Shrink the output by this factor
+            font_file {str} -- Score font, a path or arcade resource
+        """
+        self.downscale = downscale
+        self.width = width // downscale
+        self.height = height // downscale
+        self.frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self.background = np.array(BACKGROUND_COLOR[:3], dtype=np.uint8)
+        self.sprite_cache = {}
+        self.glyph_cache = {}
+        self.text_offsets = {}
+        font_pixels = SCORE_FONT_SIZE * PIXELS_PER_POINT / downscale
+        self.font = load_score_font(font_file, max(1, int(round(font_pixels))))
+
+    def render(self, game):
+        """Draw a frame in the same order as SpaceShooter.on_draw
+
+        Arguments:
+            game {SpaceShooter} -- The game to draw, or any object with the
+                cloud_layers, enemies_list, player, explosions_list and
+                score it uses. Sprite lists can be plain lists.
+
+        Returns:
+            numpy.ndarray -- The frame, height x width x 3, top row first
+        """
+        self.frame[:] = self.background
+
+        for layer in game.cloud_layers:
+            self.draw_sprite_list(layer.sprite_list, -layer.offset)
+        self.draw_sprite_list(game.enemies_list)
+        self.draw_sprite(game.player)
+        self.draw_sprite_list(game.explosions_list)
+
+        # Score with a black shadow, like on_draw
+        score_text = f"Score: {game.score}"
+        self.draw_text(score_text, 10, 10, arcade.csscolor.BLACK)
+        self.draw_text(score_text, 12, 12, arcade.csscolor.WHITE)
+
+        return self.frame
+
+    def draw_sprite_list(self, sprite_list, offset_x=0.0):
+        """Draw every sprite in a list
+
+        Arguments:
+            sprite_list {arcade.SpriteList} -- The sprites to draw
+            offset_x {float} -- Horizontal shift for scrolling layers
+        """
+        for sprite in sprite_list:
+            self.draw_sprite(sprite, offset_x)
+
+    def draw_sprite(self, sprite, offset_x=0.0):
+        """Blend one sprite into the frame, clipped to the screen
+
+        Arguments:
+            sprite {arcade.Sprite} -- The sprite to draw
+            offset_x {float} -- Horizontal shift for scrolling layers
+        """
+        rgb, alpha, opaque = self.sprite_pixels(sprite)
+        h, w = alpha.shape
+
+        # Screen y goes up, image rows go down
+        left = int(round((sprite.center_x + offset_x) / self.downscale)) - w // 2
+        if left >= self.width or left + w <= 0:
+            return
+        top = self.height - int(round(sprite.center_y / self.downscale)) - h // 2
+        if top >= self.height or top + h <= 0:
+            return
+
+        x0 = left if left > 0 else 0
+        y0 = top if top > 0 else 0
+        x1 = left + w if left + w < self.width else self.width
+        y1 = top + h if top + h < self.height else self.height
+
+        src = (slice(y0 - top, y1 - top), slice(x0 - left, x1 - left))
+        dst = self.frame[y0:y1, x0:x1]
+
+        # Pixel art is either fully on or off, so a masked copy is enough
+        if opaque:
+            np.copyto(dst, rgb[src], where=alpha[src][..., None])
+        else:
+            a = alpha[src][..., None]
+            dst[:] = rgb[src] * a + dst * (1.0 - a)
+
+    def sprite_pixels(self, sprite):
+        """Get the sprite's texture at its drawn size
+
+        Arguments:
+            sprite {arcade.Sprite} -- The sprite to look up
+
+        Returns:
+            tuple -- RGB pixels, alpha and whether the alpha is only 0 or 1
+        """
+        key = (sprite.texture.name, sprite.scale)
+        pixels = self.sprite_cache.get(key)
+
+        if pixels is None:
+            w = max(1, int(round(sprite.width / self.downscale)))
+            h = max(1, int(round(sprite.height / self.downscale)))
+            image = sprite.texture.image.convert("RGBA")
+            image = np.asarray(image.resize((w, h), Image.Resampling.NEAREST))
+            rgb = image[..., :3].copy()
+            alpha = image[..., 3]
+            opaque = bool(np.isin(alpha, (0, 255)).all())
+            if opaque:
+                alpha = alpha == 255
+            else:
+                alpha = alpha.astype(np.float32) / 255
+            pixels = self.sprite_cache[key] = (rgb, alpha, opaque)
+
+        return pixels
+
+    def draw_text(self, text, start_x, start_y, color):
+        """Draw text with its baseline at a screen position
+
+        Arguments:
+            text {str} -- The text to draw
+            start_x {float} -- Left of the text
+            start_y {float} -- Baseline of the text
+            color {tuple} -- RGB color of the text
+        """
+        left = int(start_x / self.downscale)
+        bottom = self.height - int(start_y / self.downscale)
+        color = np.array(color[:3], dtype=np.uint8)
+
+        for char, offset in zip(text, self.layout(text)):
+            mask = self.glyph(char)
+            h, w = mask.shape
+            x, top = left + offset, bottom - h
+            x0, y0 = max(x, 0), max(top, 0)
+            x1, y1 = min(x + w, self.width), min(bottom, self.height)
+            if x0 < x1 and y0 < y1:
+                src = mask[y0 - top:y1 - top, x0 - x:x1 - x]
+                np.copyto(self.frame[y0:y1, x0:x1], color,
+                          where=src[..., None])
+
+    def layout(self, text):
+        """Get where each character of a string starts
+
+        Arguments:
+            text {str} -- The text to lay out
+
+        Returns:
+            list -- Offset of each character from the start, in pixels
+        """
+        if text not in self.text_offsets:
+            # Only the current score is worth keeping
+            self.text_offsets.clear()
+            self.text_offsets[text] = [
+                int(round(self.font.getlength(text[:i])))
+                for i in range(len(text))
+            ]
+        return self.text_offsets[text]
+
+    def glyph(self, char):
+        """Get the pixel mask of one character of the score font
+
+        Arguments:
+            char {str} -- The character
+
+        Returns:
+            numpy.ndarray -- Boolean mask, baseline at the bottom row
+        """
+        if char not in self.glyph_cache:
+            ascent = self.font.getmetrics()[0]
+            width = max(1, self.font.getbbox(char)[2])
+            image = Image.new("L", (width, ascent))
+            ImageDraw.Draw(image).text((0, 0), char, fill=255, font=self.font)
+            self.glyph_cache[char] = np.asarray(image) > 127
+        return self.glyph_cache[char]
+
+
+def load_score_font(font_file, size):
+    """Load the score font
+
+    Arguments:
+        font_file {str} -- A path or arcade resource
+        size {int} -- Font size in pixels
+
+    Returns:
+        PIL.ImageFont.FreeTypeFont -- The font
+    """
+    path = arcade.resources.resolve_resource_path(font_file)
+    return ImageFont.truetype(str(path), size)
+
+
+def save_frame(frame, path):
+    """Save a frame as a PNG, for example as a new golden image
+
+    Arguments:
+        frame {numpy.ndarray} -- The frame to save
+        path {str} -- Where to write it
+    """
+    Image.fromarray(frame).save(path)
+
+
+def matches_golden(frame, path, tolerance=0, skip_rows=0):
+    """Compare a frame against a saved golden image
+
+    Arguments:
+        frame {numpy.ndarray} -- The rendered frame
+        path {str} -- The golden PNG
+        tolerance {int} -- Largest allowed difference of any channel
+        skip_rows {int} -- Rows at the bottom to leave out, such as the
+            score, whose glyphs change with the FreeType version
+
+    Returns:
+        bool -- True if the frame matches
+    """
+    golden = np.asarray(Image.open(path).convert("RGB"))
+    if golden.shape != frame.shape:
+        return False
+    rows = frame.shape[0] - skip_rows
+    diff = np.abs(golden[:rows].astype(np.int16) - frame[:rows].astype(np.int16))
+    return int(diff.max()) <= tolerance
+
+
+if __name__ == "__main__":
+    # Benchmark rendering a running game at a few output sizes.
+    # Run with ARCADE_HEADLESS=1 on machines without a display.
+    import random
+    from basic_game import SpaceShooter, SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE
+
+    # Play a few seconds, spawning enemies as often as the game does
+    random.seed(0)
+    game = SpaceShooter(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    game.setup()
+    for i in range(300):
+        if i % 12 == 0:
+            game.add_enemy(0.2)
+        game.on_update(1 / 60)
+
+    for downscale in (1, 4, 8):
+        renderer = SoftwareRenderer(SCREEN_WIDTH, SCREEN_HEIGHT, downscale)
+        renderer.render(game)
+        frames = 1000
+        start = time.perf_counter()
+        for i in range(frames):
+            renderer.render(game)
+        elapsed = time.perf_counter() - start
+        print(f"{renderer.width}x{renderer.height}: {frames / elapsed:.0f} fps")
+        sys.stdout.flush()
@@ -0,0 +1,234 @@
+# Long-session soak test for the arcade shooter
+# Runs the game headless for hours, resetting after every collision,
+# and fails if memory, objects or timers keep growing
+
+# Imports
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+# Arcade has to know it is headless before it is imported
+os.environ.setdefault("ARCADE_HEADLESS", "1")
+
+import arcade
+import pyglet
+
+from basic_game import SpaceShooter, SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE
+
+# Constants
+SAMPLE_INTERVAL = 60.0
+GROWTH_WINDOW = 6
+WARMUP_SAMPLES = 2
+TOP_ALLOCATIONS = 5
+TRACKED_TYPES = (arcade.Sprite, arcade.SpriteList, arcade.Texture)
+# Metrics that should never move once the game has settled
+FLAT_METRICS = ("timers", "capacity.")
+# Exit status when the run was too short to judge
+INCONCLUSIVE = 3
+
+
+class SessionMonitor:
+    """Samples resource usage of a running game at intervals
+    Records live object counts per type, SpriteList capacity versus
+    length, scheduled timers and traced memory, and flags any of them
+    that grow over the run
+    """
+
+    def __init__(self, game, interval=SAMPLE_INTERVAL, window=GROWTH_WINDOW,
+                 warmup=WARMUP_SAMPLES):
+        """Set up an empty sample history
+
+        Arguments:
+            game {SpaceShooter} -- The game to watch
+            interval {float} -- Seconds between samples
+            window {int} -- Samples at each end of the run to compare
+            warmup {int} -- Samples to ignore while the game settles
+        """
+        self.game = game
+        self.interval = interval
+        self.window = window
+        self.warmup = warmup
+        self.samples = []
+        self.last_sample_time = 0.0
+        self.last_snapshot = None
+
+    def sprite_lists(self):
+        """Return the game's SpriteLists by name"""
+        lists = {
+            "enemies_list": self.game.enemies_list,
+            "explosions_list": self.game.explosions_list,
+            "all_sprites": self.game.all_sprites,
+        }
+        for i, layer in enumerate(self.game.cloud_layers):
+            lists[f"cloud_layer_{i}"] = layer.sprite_list
+        return lists
+
+    def poll(self):
+        """Take a sample if the interval has passed
+
+        Returns:
+            dict -- The new sample, or None if it was not time yet
+        """
+        now = time.time()
+        if now - self.last_sample_time < self.interval:
+            return None
+        self.last_sample_time = now
+        return self.sample()
+
+    def sample(self):
+        """Record and print the current resource usage
+
+        Returns:
+            dict -- Metric name to value
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        gc.collect()
+        sample = {}
+
+        # Live objects of the types the game creates
+        for obj in gc.get_objects():
+            if isinstance(obj, TRACKED_TYPES):
+                key = f"objects.{type(obj).__name__}"
+                sample[key] = sample.get(key, 0) + 1
+
+        # SpriteList buffers only grow, so compare them to what is used.
+        # The capacity is private to arcade, so it may not be there.
+        for name, sprite_list in self.sprite_lists().items():
+            sample[f"length.{name}"] = len(sprite_list)
+            sample[f"capacity.{name}"] = getattr(
+                sprite_list, "_buf_capacity", None
+            )
+
+        # Stacked arcade.schedule calls show up as extra interval items,
+        # again private to pyglet
+        clock = pyglet.clock.get_default()
+        timers = getattr(clock, "_schedule_interval_items", None)
+        sample["timers"] = None if timers is None else len(timers)
+
+        # Leave out what the monitor itself keeps, like old samples
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+        traced = sum(stat.size for stat in snapshot.statistics("filename"))
+        sample["traced_kb"] = traced // 1024
+
+        self.samples.append(sample)
+        self.report(sample, snapshot)
+        return sample
+
+    def report(self, sample, snapshot):
+        """Print a sample and the biggest allocation changes since the last
+
+        Arguments:
+            sample {dict} -- The sample to print
+            snapshot {tracemalloc.Snapshot} -- Memory snapshot for the sample
+        """
+        print(f"--- sample {len(self.samples)} at {time.strftime('%H:%M:%S')}")
+        for key in sorted(sample):
+            value = "unavailable" if sample[key] is None else sample[key]
+            print(f"{key:>32}: {value}")
+
+        if self.last_snapshot is not None:
+            stats = snapshot.compare_to(self.last_snapshot, "lineno")
+            for stat in stats[:TOP_ALLOCATIONS]:
+                print(f"    {stat}")
+        self.last_snapshot = snapshot
+        sys.stdout.flush()
+
+    def growing(self):
+        """Find metrics that grew over the run, after the warmup
+        Metrics that should stay flat fail on any lasting rise. The rest
+        move with the number of live sprites, so they fail once the lowest
+        of the last samples is above the highest of the first ones.
+
+        Returns:
+            list -- Names of the metrics that look like leaks, or None if
+                    there are too few samples to tell
+        """
+        samples = self.samples[self.warmup:]
+        if len(samples) < 2 * self.window:
+            return None
+
+        leaks = []
+        for key in samples[-1]:
+            values = [s.get(key) for s in samples]
+            values = [v for v in values if v is not None]
+            if len(values) < self.window:
+                continue
+
+            # pyglet only drops unscheduled timers on its next tick, so a
+            # flat metric has to stay raised for the whole last window
+            if key.startswith(FLAT_METRICS):
+                if min(values[-self.window:]) > values[0]:
+                    leaks.append(key)
+            elif len(values) >= 2 * self.window:
+                first = values[:self.window]
+                last = values[-self.window:]
+                if min(last) > max(first):
+                    leaks.append(key)
+        return leaks
+
+
+def soak(hours, interval, fps):
+    """Run the game headless and watch it for leaks
+
+    Arguments:
+        hours {float} -- How long to run for
+        interval {float} -- Seconds between samples
+        fps {float} -- Highest frame rate to run at
+
+    Returns:
+        int -- Exit status, 1 if anything kept growing, INCONCLUSIVE if
+               the run was too short to judge
+    """
+    # Trace from the start so the game's own setup is counted
+    tracemalloc.start()
+    game = SpaceShooter(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    game.long_session = True
+    game.setup()
+
+    monitor = SessionMonitor(game, interval)
+    end_time = time.time() + hours * 3600
+    frame_length = 1.0 / fps
+
+    while time.time() < end_time:
+        now = time.time()
+
+        # The window schedules on_update itself, so ticking the clock
+        # and draining the event queue runs a frame like arcade.run()
+        pyglet.clock.tick()
+        game.dispatch_events()
+        game.on_draw()
+        game.flip()
+        monitor.poll()
+
+        # Don't run faster than a real window would
+        spare = frame_length - (time.time() - now)
+        if spare > 0:
+            time.sleep(spare)
+
+    monitor.sample()
+    leaks = monitor.growing()
+    if leaks is None:
+        needed = monitor.warmup + 2 * monitor.window
+        print(f"INCONCLUSIVE: {len(monitor.samples)} samples, need {needed}")
+        return INCONCLUSIVE
+    if leaks:
+        print(f"FAIL: growth in {', '.join(leaks)}")
+        return 1
+    print("PASS: no growth")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless soak test")
+    parser.add_argument("--hours", type=float, default=3.0)
+    parser.add_argument("--interval", type=float, default=SAMPLE_INTERVAL)
+    parser.add_argument("--fps", type=float, default=60.0)
+    args = parser.parse_args()
+    sys.exit(soak(args.hours, args.interval, args.fps))
@@ -0,0 +1,161 @@
+# Frame checks for the arcade shooter, drawn with the software renderer
+# Run with: python -m pytest test_frames.py
+
+# Imports
+import os
+import random
+import subprocess
+import sys
+
+# Arcade has to know it is headless before it is imported
+os.environ.setdefault("ARCADE_HEADLESS", "1")
+
+import arcade
+import numpy as np
+import pytest
+
+from basic_game import (
+    SpaceShooter,
+    ParallaxLayer,
+    CLOUD_IMAGE,
+    CLOUD_LAYERS,
+    SCALING,
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    SCREEN_TITLE,
+)
+from raster import SoftwareRenderer, matches_golden, save_frame
+
+# Golden frames live next to the tests. Run with UPDATE_GOLDEN=1 to
+# redraw them from the current renderer, then check them by eye.
+GOLDEN_DIRECTORY = "golden"
+UPDATE_GOLDEN = os.environ.get("UPDATE_GOLDEN") == "1"
+# The score sits in the bottom 80 pixels of the screen
+SCORE_ROWS = 80
+
+
+@pytest.fixture(scope="module")
+def game():
+    """One headless game window shared by every check"""
+    window = SpaceShooter(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    yield window
+    window.close()
+
+
+def play_scene(game, seed=1, frames=200):
+    """Play a fixed number of frames from a fixed seed"""
+    random.seed(seed)
+    game.setup()
+    for i in range(frames):
+        if i % 12 == 0:
+            game.add_enemy(0.2)
+        game.on_update(1 / 60)
+
+
+def draw_window(game):
+    """Draw the game through OpenGL and read the frame back"""
+    game.on_draw()
+    image = arcade.get_image(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    return np.asarray(image.convert("RGB"))
+
+
+def score_box(frame):
+    """Bounding box of the score's black shadow, in the bottom strip"""
+    top = SCREEN_HEIGHT - SCORE_ROWS
+    ys, xs = np.nonzero((frame[top:] < 60).all(axis=-1))
+    return xs.min(), xs.max(), ys.min() + top, ys.max() + top
+
+
+def draw_layer(renderer, layer):
+    """Draw a single cloud layer on a clear background"""
+    renderer.frame[:] = renderer.background
+    renderer.draw_sprite_list(layer.sprite_list, -layer.offset)
+    return renderer.frame.copy()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_cloud_layers_wrap_seamlessly(game, seed):
+    """The frame just before an offset wraps matches the one just after"""
+    random.seed(seed)
+    renderer = SoftwareRenderer(SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    for count, speed, scale in CLOUD_LAYERS:
+        layer = ParallaxLayer(CLOUD_IMAGE, count, speed, scale * SCALING,
+                              SCREEN_WIDTH, SCREEN_HEIGHT)
+        layer.offset = SCREEN_WIDTH - 1e-6
+        before = draw_layer(renderer, layer)
+        layer.offset = 0.0
+        after = draw_layer(renderer, layer)
+        assert np.array_equal(before, after)
+
+
+def test_golden_frame(game):
+    """A fixed scene, downscaled, still draws exactly as it did"""
+    play_scene(game)
+    frame = SoftwareRenderer(SCREEN_WIDTH, SCREEN_HEIGHT, 4).render(game)
+
+    path = os.path.join(GOLDEN_DIRECTORY, "scene_seed1_200x150.png")
+    if UPDATE_GOLDEN:
+        os.makedirs(GOLDEN_DIRECTORY, exist_ok=True)
+        save_frame(frame, path)
+    assert os.path.exists(path), f"missing golden frame {path}"
+    assert matches_golden(frame, path, skip_rows=SCORE_ROWS // 4)
+
+
+def test_sprites_match_on_draw(game):
+    """Outside the score, the software frame matches the OpenGL one"""
+    play_scene(game)
+    expected = draw_window(game).astype(int)
+    frame = SoftwareRenderer(SCREEN_WIDTH, SCREEN_HEIGHT).render(game)
+
+    # Leave out the score at the bottom, its font differs
+    diff = np.abs(expected - frame.astype(int)).max(axis=-1)[:-SCORE_ROWS]
+    assert (diff > 16).mean() < 0.005
+
+
+def test_score_matches_on_draw(game):
+    """The score is drawn at the same place and size as on_draw"""
+    play_scene(game, frames=0)
+    game.cloud_layers = []
+    game.player.center_y = SCREEN_HEIGHT / 2
+    game.score = 98765
+    left, right, top, bottom = score_box(draw_window(game))
+    frame = SoftwareRenderer(SCREEN_WIDTH, SCREEN_HEIGHT).render(game)
+    x0, x1, y0, y1 = score_box(frame)
+
+    # The bundled font only approximates the window's default font
+    assert abs(x0 - left) <= 6
+    assert abs((x1 - x0) - (right - left)) <= 0.1 * (right - left)
+    assert abs((y1 - y0) - (bottom - top)) <= 0.2 * (bottom - top)
+    assert abs(y1 - bottom) <= 3
+
+
+def test_render_without_a_window():
+    """Plain lists of sprites render without creating any window"""
+    script = """
+import types
+import arcade
+import raster
+from basic_game import CLOUD_IMAGE, SCREEN_WIDTH, SCREEN_HEIGHT
+
+player = arcade.Sprite("images/jet_anim/Plane_0.png")
+player.center_x, player.center_y = 100, 300
+cloud = arcade.Sprite(CLOUD_IMAGE, 0.5)
+cloud.center_x, cloud.center_y = 400, 400
+layer = types.SimpleNamespace(sprite_list=[cloud], offset=0.0)
+state = types.SimpleNamespace(
+    cloud_layers=[layer], enemies_list=[], player=player,
+    explosions_list=[], score=7,
+)
+renderer = raster.SoftwareRenderer(SCREEN_WIDTH, SCREEN_HEIGHT, 4)
+frame = renderer.render(state)
+assert (frame != renderer.background).any(axis=-1).sum() > 100
+try:
+    arcade.get_window()
+except RuntimeError:
+    print("no window")
+"""
+    result = subprocess.run([sys.executable, "-c", script],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "no window"
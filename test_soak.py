@@ -0,0 +1,100 @@
+# Checks for the long-session reset and the soak leak detector
+# Run with: python -m pytest test_soak.py
+
+# Imports
+import os
+import random
+import time
+
+# Arcade has to know it is headless before it is imported
+os.environ.setdefault("ARCADE_HEADLESS", "1")
+
+import pyglet
+import pytest
+
+from basic_game import (
+    Explosion,
+    SpaceShooter,
+    SCREEN_WIDTH,
+    SCREEN_HEIGHT,
+    SCREEN_TITLE,
+)
+from soak import SessionMonitor, GROWTH_WINDOW, WARMUP_SAMPLES
+
+
+@pytest.fixture(scope="module")
+def game():
+    """One headless game window shared by every check"""
+    window = SpaceShooter(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE)
+    window.setup()
+    yield window
+    window.close()
+
+
+def interval_timers():
+    """Number of callbacks scheduled on pyglet's clock
+    pyglet drops an unscheduled callback only once it comes due, so wait
+    out the enemy spawn interval before ticking
+    """
+    time.sleep(0.25)
+    pyglet.clock.tick()
+    return len(pyglet.clock.get_default()._schedule_interval_items)
+
+
+def test_reset_does_not_stack_timers_or_sprites(game):
+    """Each reset leaves one fresh player and the same timers"""
+    timers = interval_timers()
+
+    for i in range(5):
+        # Leave some enemies and an explosion behind
+        for j in range(3):
+            game.add_enemy(0.2)
+        explosion = Explosion(game.explosion_img, game.explosion_textures)
+        game.explosions_list.append(explosion)
+        game.all_sprites.append(explosion)
+        old_player = game.player
+
+        game.reset()
+
+        assert len(game.enemies_list) == 0
+        assert len(game.explosions_list) == 0
+        assert list(game.all_sprites) == [game.player]
+        assert game.player is not old_player
+        assert interval_timers() == timers
+
+
+def monitor_with(series):
+    """A monitor whose history is the given samples"""
+    monitor = SessionMonitor(None)
+    monitor.samples = series
+    return monitor
+
+
+def test_growing_flags_only_the_leak():
+    """Flat, noisy and briefly raised metrics pass, a slow leak fails"""
+    random.seed(0)
+    samples = []
+    for i in range(120):
+        samples.append({
+            "capacity.enemies_list": 100,
+            "objects.AnimatedSprite": 20 + random.randint(-10, 10),
+            "traced_kb": 400 + random.randint(-50, 50) + i,
+            "timers": 3 if i == 30 else 2,
+        })
+
+    assert monitor_with(samples).growing() == ["traced_kb"]
+
+
+def test_growing_flags_lasting_timer_rise():
+    """A timer that stays scheduled is a leak even though it is small"""
+    samples = [{"timers": 2 if i < 20 else 3} for i in range(40)]
+    assert monitor_with(samples).growing() == ["timers"]
+
+
+def test_growing_needs_enough_samples():
+    """A run too short to judge is reported as such, not as a pass"""
+    needed = WARMUP_SAMPLES + 2 * GROWTH_WINDOW
+    samples = [{"timers": 2} for i in range(needed)]
+
+    assert monitor_with(samples[:-1]).growing() is None
+    assert monitor_with(samples).growing() == []